@@ -72,6 +72,15 @@ class EnergyDevice:
         """
         raise NotImplementedError()
 
+    def get_energy_ranges(self) -> List[Optional[float]]:
+        """
+        Get the value at which the energy counter of each configured domain wraps around to zero
+        :return: a list of each domain counter range, None if the counter never wraps around. Value order is the same
+                 than the :py:meth:`pyJoules.energy_device.EnergyDevice.get_energy` one
+        :raise NotConfiguredDeviceException: if the device was not configured
+        """
+        return [None] * len(self.get_configured_domains())
+
     def get_configured_domains(self):
         """
         Get the domains that was passed as argument to the configure function
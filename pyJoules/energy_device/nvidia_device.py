@@ -36,7 +36,10 @@ class NvidiaGPUDomain(EnergyDomain):
         return self._repr
 
     def __eq__(self, other) -> bool:
-        return isinstance(other, NvidiaGPUDomain) and self.__repr__() == other.__repr__()
+        return isinstance(other, NvidiaGPUDomain) and self._repr == other._repr
+
+    def __hash__(self) -> int:
+        return hash(self._repr)
 
     def __lt__(self, other) -> bool:
         if isinstance(other, NvidiaGPUDomain):
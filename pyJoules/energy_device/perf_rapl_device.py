@@ -0,0 +1,189 @@
+# MIT License
+# Copyright (c) 2019, INRIA
+# Copyright (c) 2019, University of Lille
+# All rights reserved.
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import os
+import errno
+import ctypes
+import struct
+import platform
+from typing import List
+
+from . import EnergyDevice
+from .rapl_device import RaplDomain, RaplPackageDomain, RaplDramDomain, RaplCoreDomain, RaplUncoreDomain
+from ..exception import NoSuchEnergyDeviceError
+
+
+PERF_RAPL_API_DIR = '/sys/devices/power'
+
+# perf event name of each RAPL domain, in the order used by RaplDevice.available_domains
+RAPL_EVENTS = [(RaplPackageDomain, 'energy-pkg'),
+               (RaplDramDomain, 'energy-ram'),
+               (RaplCoreDomain, 'energy-cores'),
+               (RaplUncoreDomain, 'energy-gpu')]
+
+_PERF_EVENT_OPEN_SYSCALL = {'x86_64': 298, 'i386': 336, 'i686': 336}
+
+# struct perf_event_attr in its first published version (PERF_ATTR_SIZE_VER0) : type, size, config, sample_period,
+# sample_type, read_format, flags, wakeup_events, bp_type, config1
+_PERF_EVENT_ATTR = struct.Struct('<IIQQQQQIIQ')
+
+PERF_FORMAT_GROUP = 1 << 3
+
+# perf_event_open flag making the event fd close-on-exec, like the fds opened by os.open
+PERF_FLAG_FD_CLOEXEC = 1 << 3
+
+
+def _perf_event_open(attr: bytes, pid: int, cpu: int, group_fd: int, flags: int) -> int:
+    """
+    call the perf_event_open syscall
+    :return: the file descriptor of the opened event
+    :raise OSError: if the event could not be opened
+    """
+    if platform.machine() not in _PERF_EVENT_OPEN_SYSCALL:
+        raise OSError(errno.ENOSYS, 'perf_event_open syscall number unknown on ' + platform.machine())
+    libc = ctypes.CDLL(None, use_errno=True)
+    libc.syscall.restype = ctypes.c_long
+    attr_buffer = ctypes.create_string_buffer(attr, len(attr))
+    fd = libc.syscall(_PERF_EVENT_OPEN_SYSCALL[platform.machine()], attr_buffer, pid, cpu, group_fd, flags)
+    if fd == -1:
+        error_code = ctypes.get_errno()
+        raise OSError(error_code, os.strerror(error_code))
+    return fd
+
+
+def _read_api_file(file_name: str) -> str:
+    with open(file_name) as api_file:
+        return api_file.readline().strip()
+
+
+class PerfEventRaplDevice(EnergyDevice):
+    """
+    Interface to get energy consumption of CPU domains through the perf_event RAPL counters
+
+    Counters are read as 64 bits integers, already corrected from overflow by the kernel. This device is not created
+    by the :py:class:`pyJoules.energy_device.EnergyDeviceFactory`, it has to be instantiated explicitly
+    """
+
+    def __init__(self):
+        """
+        :raise NoSuchEnergyDeviceError: if no perf_event RAPL API is available on this machine
+        """
+        self._api_fds = None
+        self._groups = None
+        EnergyDevice.__init__(self)
+
+    @staticmethod
+    def _get_socket_cpu_list() -> List[int]:
+        """
+        return the CPU used to open events of each socket, the power PMU cpumask contains one CPU per socket
+        """
+        cpu_list = []
+        for cpu_range in _read_api_file(PERF_RAPL_API_DIR + '/cpumask').split(','):
+            first_cpu, _, last_cpu = cpu_range.partition('-')
+            cpu_list += range(int(first_cpu), int(last_cpu or first_cpu) + 1)
+        return cpu_list
+
+    @staticmethod
+    def available_domains() -> List[RaplDomain]:
+        """
+        return a the list of the available energy domains
+        """
+        if not os.path.exists(PERF_RAPL_API_DIR + '/type'):
+            raise NoSuchEnergyDeviceError()
+
+        socket_id_list = range(len(PerfEventRaplDevice._get_socket_cpu_list()))
+        domains = []
+        for domain_type, event_name in RAPL_EVENTS:
+            if os.path.exists(PERF_RAPL_API_DIR + '/events/' + event_name):
+                domains += [domain_type(socket_id) for socket_id in socket_id_list]
+        return domains
+
+    @staticmethod
+    def _get_event_name(domain: RaplDomain) -> str:
+        for domain_type, event_name in RAPL_EVENTS:
+            if isinstance(domain, domain_type):
+                return event_name
+        raise ValueError()
+
+    def _open_events(self, domain_list):
+        """
+        open one event group per socket, a group could only contains events of the same CPU. The values of every
+        event of a group are then returned by one read on the group leader
+        """
+        pmu_type = int(_read_api_file(PERF_RAPL_API_DIR + '/type'))
+        socket_cpu_list = self._get_socket_cpu_list()
+
+        api_fds = []
+        groups = {}
+        try:
+            for position, domain in enumerate(domain_list):
+                event_file_name = PERF_RAPL_API_DIR + '/events/' + self._get_event_name(domain)
+                # event file content looks like "event=0x02"
+                config = int(_read_api_file(event_file_name).split('=')[1], 16)
+                attr = _PERF_EVENT_ATTR.pack(pmu_type, _PERF_EVENT_ATTR.size, config, 0, 0, PERF_FORMAT_GROUP,
+                                             0, 0, 0, 0)
+                # scale converts counter unit to Joules, values are returned in micro Joules like RaplDevice ones
+                scale = float(_read_api_file(event_file_name + '.scale')) * 1e6
+
+                cpu = socket_cpu_list[domain.socket]
+                if cpu not in groups:
+                    api_fd = _perf_event_open(attr, -1, cpu, -1, PERF_FLAG_FD_CLOEXEC)
+                    groups[cpu] = (api_fd, [], [])
+                else:
+                    api_fd = _perf_event_open(attr, -1, cpu, groups[cpu][0], PERF_FLAG_FD_CLOEXEC)
+                api_fds.append(api_fd)
+                groups[cpu][1].append(position)
+                groups[cpu][2].append(scale)
+        except BaseException:
+            # do not leak the events already opened if one of them could not be opened
+            for api_fd in api_fds:
+                os.close(api_fd)
+            raise
+
+        # group read format is the number of events followed by the value of each event, in the order they were opened
+        return api_fds, [(leader_fd, struct.Struct('<8x' + 'Q' * len(positions)), positions, scales)
+                         for leader_fd, positions, scales in groups.values()]
+
+    def configure(self, domains=None):
+        EnergyDevice.configure(self, domains)
+
+        self.close()
+        self._api_fds, self._groups = self._open_events(self._configured_domains)
+
+    def close(self):
+        """
+        Close the perf events opened by the last call to the
+        :py:meth:`pyJoules.energy_device.perf_rapl_device.PerfEventRaplDevice.configure` method
+        """
+        if self._api_fds is None:
+            return
+        for api_fd in self._api_fds:
+            os.close(api_fd)
+        self._api_fds = None
+
+    def __del__(self):
+        self.close()
+
+    def get_energy(self):
+        energy = [None] * len(self._api_fds)
+        for leader_fd, group_values, positions, scales in self._groups:
+            counters = group_values.unpack(os.read(leader_fd, group_values.size))
+            for position, counter, scale in zip(positions, counters, scales):
+                energy[position] = counter * scale
+        return energy
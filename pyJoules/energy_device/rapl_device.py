@@ -18,7 +18,7 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 import os
-from typing import List
+from typing import Callable, Dict, List, Optional, Tuple
 
 from . import EnergyDevice, EnergyDomain, NotConfiguredDeviceException
 from pyJoules.exception import NoSuchEnergyDeviceError
@@ -47,7 +47,10 @@ class RaplDomain(EnergyDomain):
         return self._repr
 
     def __eq__(self, other) -> bool:
-        return isinstance(other, RaplDomain) and self.__repr__() == other.__repr__()
+        return isinstance(other, RaplDomain) and self._repr == other._repr
+
+    def __hash__(self) -> int:
+        return hash(self._repr)
 
     def __lt__(self, other) -> bool:
         if isinstance(other, RaplDomain):
@@ -82,143 +85,210 @@ class RaplPackageDomain(RaplDomain):
 
 RAPL_API_DIR = '/sys/class/powercap/intel-rapl'
 
+# domain type of each RAPL sub-zone name, sub-zones are the intel-rapl:<socket>:<id> directories of a socket zone
+RAPL_SUB_ZONE_DOMAINS = {'dram': RaplDramDomain, 'core': RaplCoreDomain, 'uncore': RaplUncoreDomain}
+
+# order of the domains returned by RaplDevice.available_domains
+RAPL_DOMAIN_ORDER = [RaplPackageDomain, RaplDramDomain, RaplCoreDomain, RaplUncoreDomain]
+
+# RAPL domains does not change while the machine is running, the API is scanned once and a dict mapping the
+# available domains to the name of their energy file kept here
+_cached_domain_files = None
+
+
+def _list_zone_dirs(dir_name: str, zone_prefix: str) -> List[Tuple[int, str]]:
+    """
+    :return: id and path of the zone directories, named zone_prefix followed by the zone id, contained in dir_name
+    """
+    zone_dirs = []
+    with os.scandir(dir_name) as entries:
+        for entry in entries:
+            zone_id = entry.name[len(zone_prefix):]
+            if entry.name.startswith(zone_prefix) and zone_id.isdigit():
+                zone_dirs.append((int(zone_id), entry.path))
+    return sorted(zone_dirs)
+
+
+def _read_zone_name(zone_dir_name: str) -> Optional[str]:
+    """
+    :return: the content of the zone name file, None if the zone has no name file
+    """
+    try:
+        name_fd = os.open(zone_dir_name + '/name', os.O_RDONLY)
+    except FileNotFoundError:
+        return None
+    try:
+        return os.read(name_fd, 64).decode().strip()
+    finally:
+        os.close(name_fd)
+
+
+def _gen_energy_reader(api_fds: List[int]) -> Callable[[], List[float]]:
+    """
+    generate a function reading the energy value of each given API file. The function source contains one read
+    expression per file, with the file descriptor as a constant, so no loop is run when the function is called
+    """
+    read_expressions = ', '.join('float(pread(' + str(api_fd) + ', 32, 0))' for api_fd in api_fds)
+    namespace = {'pread': os.pread}
+    exec('def read_energy():\n    return [' + read_expressions + ']\n', namespace)
+    return namespace['read_energy']
+
 
 class RaplDevice(EnergyDevice):
     """
     Interface to get energy consumption of CPU domains
     """
 
-    def __init__(self):
+    def __init__(self, force_rescan: bool = False):
         """
+        :param force_rescan: if True, scan the RAPL API again instead of using the domains found by a previous scan
         :raise NoSuchEnergyDeviceError: if no RAPL API is available on this machine
         """
+        global _cached_domain_files
+        if force_rescan:
+            _cached_domain_files = None
+
+        self._api_fds = None
+        self._read_energy = None
+        self._energy_ranges = None
         EnergyDevice.__init__(self)
-        self._api_files = None
 
     @staticmethod
     def _rapl_api_available():
         return os.path.exists(RAPL_API_DIR)
 
     @staticmethod
-    def available_domains() -> List[RaplDomain]:
+    def _scan_rapl_api() -> Dict[RaplDomain, str]:
         """
-        return a the list of the available energy domains
+        walk the RAPL API directory once, reading the name of each socket zone and of its sub-zones
+        :return: a dict mapping the available domains to the name of the file containing their energy value
         """
-        if not RaplDevice._rapl_api_available():
-            raise NoSuchEnergyDeviceError()
+        domain_files = []
+        for socket_id, socket_dir_name in _list_zone_dirs(RAPL_API_DIR, 'intel-rapl:'):
+            if _read_zone_name(socket_dir_name) == 'package-' + str(socket_id):
+                domain_files.append((RaplPackageDomain(socket_id), socket_dir_name + '/energy_uj'))
 
-        return (RaplDevice.available_package_domains() + RaplDevice.available_dram_domains() +
-                RaplDevice.available_core_domains() + RaplDevice.available_uncore_domains())
+            for _, sub_zone_dir_name in _list_zone_dirs(socket_dir_name, 'intel-rapl:' + str(socket_id) + ':'):
+                domain_type = RAPL_SUB_ZONE_DOMAINS.get(_read_zone_name(sub_zone_dir_name))
+                if domain_type is not None:
+                    domain_files.append((domain_type(socket_id), sub_zone_dir_name + '/energy_uj'))
 
-    @staticmethod
-    def _get_socket_id_list():
-        socket_id_list = []
-        socket_id = 0
-        while True:
-            name = RAPL_API_DIR + '/intel-rapl:' + str(socket_id)
-            if os.path.exists(name):
-                socket_id_list.append(socket_id)
-                socket_id += 1
-            else:
-                return socket_id_list
+        return dict(sorted(domain_files, key=lambda domain_file: (RAPL_DOMAIN_ORDER.index(type(domain_file[0])),
+                                                                  domain_file[0].socket)))
 
     @staticmethod
-    def available_package_domains() -> List[RaplPackageDomain]:
+    def _get_domain_files() -> Dict[RaplDomain, str]:
         """
-        return a the list of the available energy Package domains
+        :return: a dict mapping the available domains to the name of their energy file. The RAPL API is only scanned
+                 on the first call
+        :raise NoSuchEnergyDeviceError: if no RAPL API is available on this machine
         """
-        package_domains = []
+        global _cached_domain_files
+        if _cached_domain_files is None:
+            if not RaplDevice._rapl_api_available():
+                raise NoSuchEnergyDeviceError()
+            _cached_domain_files = RaplDevice._scan_rapl_api()
+        return _cached_domain_files
 
-        for socket_id in RaplDevice._get_socket_id_list():
-            domain_name_file_str = RAPL_API_DIR + '/intel-rapl:' + str(socket_id) + '/name'
-            if os.path.exists(domain_name_file_str):
-                domain_name_file = open(domain_name_file_str)
-                if domain_name_file.readline() == 'package-' + str(socket_id) + '\n':
-                    package_domains.append(RaplPackageDomain(socket_id))
-        return package_domains
+    @staticmethod
+    def _get_available_domains_of_type(domain_type) -> List[RaplDomain]:
+        return [domain for domain in RaplDevice._get_domain_files() if isinstance(domain, domain_type)]
 
     @staticmethod
-    def _domain_exist_on_socket(socket_id, domain_name):
-        domain_id = 0
-        while True:
-            domain_name_file_str = (RAPL_API_DIR + '/intel-rapl:' + str(socket_id) + '/intel-rapl:' + str(socket_id) +
-                                    ':' + str(domain_id) + '/name')
-            if os.path.exists(domain_name_file_str):
-                domain_name_file = open(domain_name_file_str)
-                if domain_name_file.readline() == domain_name + '\n':
-                    return True
-                domain_id += 1
-            else:
-                return False
+    def available_domains() -> List[RaplDomain]:
+        """
+        return a the list of the available energy domains, the RAPL API is only scanned on the first call
+        """
+        return list(RaplDevice._get_domain_files())
+
+    @staticmethod
+    def available_package_domains() -> List[RaplPackageDomain]:
+        """
+        return a the list of the available energy Package domains
+        """
+        return RaplDevice._get_available_domains_of_type(RaplPackageDomain)
 
     @staticmethod
     def available_dram_domains() -> List[RaplDramDomain]:
         """
         return a the list of the available energy Dram domains
         """
-        dram_domains = []
-        for socket_id in RaplDevice._get_socket_id_list():
-            if RaplDevice._domain_exist_on_socket(socket_id, 'dram'):
-                dram_domains.append(RaplDramDomain(socket_id))
-        return dram_domains
+        return RaplDevice._get_available_domains_of_type(RaplDramDomain)
 
     @staticmethod
     def available_core_domains() -> List[RaplCoreDomain]:
         """
         return a the list of the available energy Core domains
         """
-        core_domains = []
-        for socket_id in RaplDevice._get_socket_id_list():
-            if RaplDevice._domain_exist_on_socket(socket_id, 'core'):
-                core_domains.append(RaplCoreDomain(socket_id))
-        return core_domains
+        return RaplDevice._get_available_domains_of_type(RaplCoreDomain)
 
     @staticmethod
     def available_uncore_domains() -> List[RaplUncoreDomain]:
         """
         return a the list of the available energy Uncore domains
         """
-        uncore_domains = []
-        for socket_id in RaplDevice._get_socket_id_list():
-            if RaplDevice._domain_exist_on_socket(socket_id, 'uncore'):
-                uncore_domains.append(RaplUncoreDomain(socket_id))
-        return uncore_domains
+        return RaplDevice._get_available_domains_of_type(RaplUncoreDomain)
 
     def _get_domain_file_name(self, domain):
-        socket_id = domain.socket
-
-        if isinstance(domain, RaplPackageDomain):
-            return RAPL_API_DIR + '/intel-rapl:' + str(socket_id) + '/energy_uj'
-
-        domain_id = 0
-        while True:
-            domain_name_file_str = (RAPL_API_DIR + '/intel-rapl:' + str(socket_id) + '/intel-rapl:' + str(socket_id) +
-                                    ':' + str(domain_id) + '/name')
-            if os.path.exists(domain_name_file_str):
-                domain_name_file = open(domain_name_file_str)
-                if domain_name_file.readline() == domain.get_domain_name() + '\n':
-                    return (RAPL_API_DIR + '/intel-rapl:' + str(socket_id) + '/intel-rapl:' + str(socket_id) +
-                            ':' + str(domain_id) + '/energy_uj')
-                else:
-                    domain_id += 1
-            else:
-                raise ValueError()
+        domain_files = self._get_domain_files()
+        if domain not in domain_files:
+            raise ValueError()
+        return domain_files[domain]
 
     def _open_api_files(self, domain_list):
-        api_files = []
+        api_fds = []
+        try:
+            for domain in domain_list:
+                domain_file_name = self._get_domain_file_name(domain)
+                api_fds.append(os.open(domain_file_name, os.O_RDONLY))
+        except BaseException:
+            # do not leak the files already opened if one of them could not be opened
+            for api_fd in api_fds:
+                os.close(api_fd)
+            raise
+        return api_fds
+
+    def _read_energy_ranges(self, domain_list):
+        energy_ranges = []
         for domain in domain_list:
-            domain_file_name = self._get_domain_file_name(domain)
-            api_files.append(open(domain_file_name))
-        return api_files
+            range_file_name = os.path.dirname(self._get_domain_file_name(domain)) + '/max_energy_range_uj'
+            if os.path.exists(range_file_name):
+                with open(range_file_name) as range_file:
+                    energy_ranges.append(float(range_file.readline()))
+            else:
+                energy_ranges.append(None)
+        return energy_ranges
 
     def configure(self, domains=None):
         EnergyDevice.configure(self, domains)
 
-        self._api_files = self._open_api_files(self._configured_domains)
+        self.close()
+        self._api_fds = self._open_api_files(self._configured_domains)
+        self._read_energy = _gen_energy_reader(self._api_fds)
+        self._energy_ranges = self._read_energy_ranges(self._configured_domains)
+
+    def get_energy_ranges(self):
+        if self._energy_ranges is None:
+            raise NotConfiguredDeviceException()
+        return self._energy_ranges
+
+    def close(self):
+        """
+        Close the API files opened by the last call to the
+        :py:meth:`pyJoules.energy_device.rapl_device.RaplDevice.configure` method
+        """
+        if self._api_fds is None:
+            return
+        for api_fd in self._api_fds:
+            os.close(api_fd)
+        self._api_fds = None
+        self._read_energy = None
 
-    def _read_energy_value(self, api_file):
-        api_file.seek(0, 0)
-        return float(api_file.readline())
+    def __del__(self):
+        self.close()
 
     def get_energy(self):
-        return [self._read_energy_value(api_file) for api_file in self._api_files]
+        # API files are kept open and read from offset 0 with one pread call instead of a seek and a buffered read.
+        # float parses the bytes without decoding them, faster than int, and exactly represents any energy_uj value.
+        # Reads are done by a function generated for the configured files, see _gen_energy_reader
+        return self._read_energy()
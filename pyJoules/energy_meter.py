@@ -23,25 +23,15 @@ import time
 import operator
 import functools
 
+from array import array
 from functools import reduce
-from typing import List, Optional
+from typing import Callable, Iterator, List, Optional
 
 from .exception import PyJoulesException
 from .energy_device import EnergyDevice, EnergyDomain, EnergyDeviceFactory
 from .energy_handler import EnergyHandler, PrintHandler
 from . import EnergySample
 
-class NoNextStateException(PyJoulesException):
-    """Exception raised when trying to compute duration or energy from a state
-    which is the last state of an energy trace.
-    """
-
-
-class StateIsNotFinalError(PyJoulesException):
-    """Exception raised when trying to add a state to a non final state on an energy trace
-    """
-
-
 class EnergyMeterNotStartedError(PyJoulesException):
     """
     Exception raised when trying to stop or record on a non started EnergyMeter instance
@@ -60,36 +50,89 @@ class SampleNotFoundError(PyJoulesException):
     """
 
 
+def _build_sample(domain_names: List[str], energy_ranges: List[float], timestamps: array, tags: List[str],
+                  trace: array, sample_id: int) -> EnergySample:
+    """
+    build a sample of the trace, sample n energy values are the difference between measure n + 1 and measure n
+    values
+    """
+    domain_number = len(domain_names)
+    offset = sample_id * domain_number
+    values = trace[offset:offset + domain_number]
+    next_values = trace[offset + domain_number:offset + 2 * domain_number]
+    energy = {}
+    for domain_name, value, next_value, energy_range in zip(domain_names, values, next_values, energy_ranges):
+        # a counter lower than its previous value has wrapped around
+        energy_delta = next_value - value
+        energy[domain_name] = energy_delta + energy_range if energy_delta < 0 else energy_delta
+
+    # timestamps are integers, durations are computed without rounding before being converted to seconds
+    timestamp = timestamps[sample_id]
+    duration = timestamps[sample_id + 1] - timestamp
+    return EnergySample(timestamp / 1e9, tags[sample_id], duration / 1e9, energy)
+
+
+def _iter_samples(domain_names: List[str], energy_ranges: List[float], timestamps: array, tags: List[str],
+                  trace: array, sample_number: int) -> Iterator[EnergySample]:
+    """
+    yield the first sample_number samples of the given trace
+    """
+    for sample_id in range(sample_number):
+        yield _build_sample(domain_names, energy_ranges, timestamps, tags, trace, sample_id)
+
+
 class EnergyMeter:
     """
     Tool used to record the energy consumption of given devices
     """
 
-    def __init__(self, devices: List[EnergyDevice], default_tag: str = ''):
+    def __init__(self, devices: List[EnergyDevice], default_tag: str = '', clock: Optional[Callable[[], int]] = None):
         """
         :param devices: list of the monitored devices
         :param default_tag: tag given if no tag were given to a measure
+        :param clock: function returning the timestamp of a measure, in nanoseconds. If None, time.perf_counter_ns is
+                      used
         """
         self.devices = devices
         self.default_tag = default_tag
-
-        self._last_state = None
-        self._first_state = None
+        self._clock = clock if clock is not None else time.perf_counter_ns
+
+        # the trace is stored as flat arrays : one timestamp (in nanoseconds) and one tag per measure and, in _trace,
+        # the energy values of every monitored domain for each measure, one measure after the other. Domain names are
+        # shared by every sample of the trace
+        self._domain_names = None
+        self._energy_ranges = None
+        self._timestamps = None
+        self._tags = None
+        self._trace = None
+        self._tag_index = None
 
     def _measure_new_state(self, tag):
-        timestamp = time.perf_counter()
-        values = [device.get_energy() for device in self.devices]
-
-        return EnergyState(timestamp, tag if tag is not None else self.default_tag, values)
+        timestamp = self._clock()
+        # every device is read before the trace is modified, a failing read must not leave a partial measure that
+        # would shift the values of all the following measures
+        values = [value for device in self.devices for value in device.get_energy()]
+        if len(values) != len(self._domain_names):
+            raise ValueError('devices returned ' + str(len(values)) + ' energy values for ' +
+                             str(len(self._domain_names)) + ' monitored domains')
+
+        self._timestamps.append(timestamp)
+        self._tags.append(tag if tag is not None else self.default_tag)
+        self._trace.extend(values)
 
     def start(self, tag: Optional[str] = None):
         """
         Begin a new energy trace
         :param tag: sample name
         """
-        new_state = self._measure_new_state(tag)
-        self._first_state = new_state
-        self._last_state = new_state
+        self._domain_names = [str(domain) for domain in self._get_domain_list()]
+        # counters that never wrap around get a zero range
+        self._energy_ranges = [energy_range or 0 for device in self.devices
+                               for energy_range in device.get_energy_ranges()]
+        self._timestamps = array('q')
+        self._tags = []
+        self._trace = array('d')
+        self._measure_new_state(tag)
 
     def record(self, tag: Optional[str] = None):
         """
@@ -97,24 +140,25 @@ class EnergyMeter:
         :param tag: sample name
         :raise EnergyMeterNotStartedError: if the energy meter isn't started
         """
-        if self._first_state is None:
+        if self._timestamps is None:
             raise EnergyMeterNotStartedError()
 
-        new_state = self._measure_new_state(tag)
-        self._last_state.add_next_state(new_state)
-        self._last_state = new_state
+        self._measure_new_state(tag)
 
     def stop(self):
         """
         Set the end of the energy trace
         :raise EnergyMeterNotStartedError: if the energy meter isn't started
         """
-        if self._first_state is None:
+        if self._timestamps is None:
             raise EnergyMeterNotStartedError()
 
-        new_state = self._measure_new_state('__stop__')
-        self._last_state.add_next_state(new_state)
-        self._last_state = new_state
+        self._measure_new_state('__stop__')
+
+        # index of the first sample having each tag, the last tag is the one of the stop measure, not of a sample
+        self._tag_index = {}
+        for sample_id, sample_tag in enumerate(self._tags[:-1]):
+            self._tag_index.setdefault(sample_tag, sample_id)
 
     def get_sample(self, tag: str) -> EnergySample:
         """
@@ -124,16 +168,16 @@ class EnergyMeter:
         :raise EnergyMeterNotStoppedError: if the energy meter isn't stopped
         :raise SampleNotFoundError: if the trace doesn't contains a sample with the given tag name
         """
-        if self._first_state is None:
+        if self._timestamps is None:
             raise EnergyMeterNotStartedError()
 
-        if not self._last_state.tag == '__stop__':
+        if not self._tags[-1] == '__stop__':
             raise EnergyMeterNotStoppedError()
 
-        for sample in self:
-            if sample.tag == tag:
-                return sample
-        raise SampleNotFoundError()
+        if tag not in self._tag_index:
+            raise SampleNotFoundError()
+        return _build_sample(self._domain_names, self._energy_ranges, self._timestamps, self._tags, self._trace,
+                             self._tag_index[tag])
 
     def _get_domain_list(self):
         """
@@ -146,93 +190,15 @@ class EnergyMeter:
         iterate on the energy sample of the last trace
         :raise EnergyMeterNotStoppedError: if the energy meter isn't stopped
         """
-        if self._first_state is None:
+        if self._timestamps is None:
             raise EnergyMeterNotStartedError()
 
-        if not self._last_state.tag == '__stop__':
+        if not self._tags[-1] == '__stop__':
             raise EnergyMeterNotStoppedError()
-        domains = self._get_domain_list()
-        return SampleIterator(self._first_state, domains)
-
-class SampleIterator:
-
-    def __init__(self, first_state, domains):
-        self.domains = domains
-        self._current_state = first_state
-
-    def _gen_sample(self, state):
-        return EnergySample(state.timestamp, state.tag, state.compute_duration(), state.compute_energy(self.domains))
-
-    def __next__(self):
-        if self._current_state.next_state is None:
-            raise StopIteration()
-
-        sample = self._gen_sample(self._current_state)
-        self._current_state = self._current_state.next_state
-        return sample
-
-
-class EnergyState:
-    """
-    Internal class that record the current energy state of the monitored device
-    """
-
-    def __init__(self, timestamp: float, tag: str, values: List[float]):
-        """
-        :param timstamp: timestamp of the measure
-        :param tag: tag of the measure
-        :param values: energy consumption measure, this is the list of measured energy consumption values for each
-                       monitored device. This list contains the energy consumption since the last device reset to the
-                       end of this sample
-        """
-        self.timestamp = timestamp
-        self.tag = tag
-        self.values = values
-        self.next_state = None
-
-    def is_last(self) -> bool:
-        """
-        indicate if the current state is the last state of the trace or not
-         :return: True if the current state is the last state of the trace False otherwise
-        """
-        return self.next_state is None
-
-    def compute_duration(self) -> float:
-        """
-        :return: compute the time elipsed between the current state and the next state
-        :raise NoNextStateException: if the state is the last state of the trace
-        """
-        if self.next_state is None:
-            raise NoNextStateException()
-
-        return self.next_state.timestamp - self.timestamp
-
-    def compute_energy(self, domains) -> List[float]:
-        """
-        :return: compute the energy consumed between the current state and the next state
-        :raise NoNextStateException: if the state is the last state of the trace
-        """
-        if self.next_state is None:
-            raise NoNextStateException()
-
-        energy = []
-        for next_state_device, current_state_device in zip(self.next_state.values, self.values):
-            for next_value, current_value in zip(next_state_device, current_state_device):
-                energy.append(next_value - current_value)
-
-        values_dict = {}
-        for value, key in zip(energy, domains):
-            values_dict[str(key)] = value
-        return values_dict
-
-    def add_next_state(self, state: EnergyState):
-        """
-        :param previous: next state for the same energy trace
-        :raise StateIsNotFinalError: if there are already a next state
-        """
-        if self.next_state is not None:
-            raise StateIsNotFinalError()
-        self.next_state = state
+        # samples are built one at a time, when the iteration reaches them, from the trace that was current when the
+        # iteration began : a new trace started meanwhile does not change them
+        return _iter_samples(self._domain_names, self._energy_ranges, self._timestamps, self._tags, self._trace,
+                             len(self._timestamps) - 1)
 
 
 def measureit(func=None ,handler: EnergyHandler = PrintHandler(), domains: Optional[List[EnergyDomain]] = None):
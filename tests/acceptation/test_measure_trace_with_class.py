@@ -23,22 +23,19 @@ Test to measure energy consumption of a trace only with the energy meter
 """
 import pytest
 
-from mock import patch
-
 from pyJoules.energy_device.rapl_device import RaplDevice, RaplPackageDomain, RaplDramDomain
 from pyJoules.energy_device.nvidia_device import NvidiaGPUDevice, NvidiaGPUDomain
 from pyJoules.energy_meter import EnergyMeter
-from ..utils.rapl_fs import fs_pkg_dram_one_socket
+from ..utils.rapl_fs import fs_pread, fs_pkg_dram_one_socket
 from ..utils.fake_nvidia_api import one_gpu_api
 from ..utils.fake_api import CorrectTrace
 from ..utils.sample import assert_sample_are_equals
 
 
-TIMESTAMP_TRACE = [1.1, 2.2, 3.3, 4.4, 5.5]
+TIMESTAMP_TRACE = [1100000000, 2200000000, 3300000000, 4400000000, 5500000000]
 
 
-@patch('time.perf_counter', side_effect=TIMESTAMP_TRACE)
-def test_measure_rapl_device_all_domains(_mocked_perf_counter, fs_pkg_dram_one_socket, one_gpu_api):
+def test_measure_rapl_device_all_domains(fs_pkg_dram_one_socket, one_gpu_api):
     domains = [RaplPackageDomain(0), RaplDramDomain(0), NvidiaGPUDomain(0)]
 
     correct_trace = CorrectTrace(domains, [fs_pkg_dram_one_socket, one_gpu_api], TIMESTAMP_TRACE)  # test
@@ -49,7 +46,7 @@ def test_measure_rapl_device_all_domains(_mocked_perf_counter, fs_pkg_dram_one_s
     nvidia = NvidiaGPUDevice()
     nvidia.configure(domains=[NvidiaGPUDomain(0)])
     
-    meter = EnergyMeter([rapl, nvidia])
+    meter = EnergyMeter([rapl, nvidia], clock=iter(TIMESTAMP_TRACE).__next__)
 
     correct_trace.add_new_sample('foo')  # test
     meter.start(tag="foo")
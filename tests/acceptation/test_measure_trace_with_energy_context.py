@@ -28,15 +28,15 @@ from mock import patch
 from pyJoules.energy_device.rapl_device import RaplDevice, RaplPackageDomain, RaplDramDomain
 from pyJoules.energy_device.nvidia_device import NvidiaGPUDomain
 from pyJoules.energy_meter import EnergyMeter, EnergyContext
-from .. utils.rapl_fs import fs_pkg_dram_one_socket
+from .. utils.rapl_fs import fs_pread, fs_pkg_dram_one_socket
 from ..utils.fake_nvidia_api import one_gpu_api
 from .. utils.fake_api import CorrectTrace
 from ..utils.sample import assert_sample_are_equals
 
-TIMESTAMP_TRACE = [1.1, 2.2, 3.3, 4.4, 5.5]
+TIMESTAMP_TRACE = [1100000000, 2200000000, 3300000000, 4400000000, 5500000000]
 
 @patch('pyJoules.energy_handler.EnergyHandler')
-@patch('time.perf_counter', side_effect=TIMESTAMP_TRACE)
+@patch('time.perf_counter_ns', side_effect=TIMESTAMP_TRACE)
 def test_measure_rapl_device_all_domains(mocked_handler, _mocked_perf_counter, fs_pkg_dram_one_socket, one_gpu_api):
 
     domains = [RaplPackageDomain(0), RaplDramDomain(0), NvidiaGPUDomain(0)]
@@ -57,7 +57,7 @@ def test_measure_rapl_device_all_domains(mocked_handler, _mocked_perf_counter, f
         assert_sample_are_equals(correct_sample, measured_sample)  # test
 
 @patch('pyJoules.energy_handler.EnergyHandler')
-@patch('time.perf_counter', side_effect=TIMESTAMP_TRACE)
+@patch('time.perf_counter_ns', side_effect=TIMESTAMP_TRACE)
 def test_measure_rapl_device_default_values(mocked_handler, _mocked_perf_counter, fs_pkg_dram_one_socket, one_gpu_api):
 
     correct_trace = CorrectTrace([RaplPackageDomain(0), RaplDramDomain(0), NvidiaGPUDomain(0)],
@@ -38,3 +38,7 @@ def test_repr_return_nvidia_gpu_underscore_device_id(integer_value):
 def test_get_device_type_return_NvidiaGPUDevice():
     domain = NvidiaGPUDomain(0)
     assert domain.get_device_type() == NvidiaGPUDevice
+
+
+def test_equal_domains_have_same_hash(integer_value):
+    assert hash(NvidiaGPUDomain(integer_value)) == hash(NvidiaGPUDomain(integer_value))
@@ -0,0 +1,120 @@
+# MIT License
+# Copyright (c) 2019, INRIA
+# Copyright (c) 2019, University of Lille
+# All rights reserved.
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import errno
+import pytest
+
+from mock import patch
+
+from .... utils.perf_rapl_fs import empty_perf_fs, perf_pkg_one_socket, perf_pkg_dram_two_socket
+from .... utils.perf_rapl_fs import COUNTERS_DIR_NAME, DRAM_CONFIG
+
+from pyJoules.energy_device.perf_rapl_device import PerfEventRaplDevice, _perf_event_open
+from pyJoules.energy_device.rapl_device import RaplPackageDomain, RaplDramDomain
+from pyJoules.exception import NoSuchEnergyDeviceError, NoSuchDomainError
+
+
+##############
+# INIT TESTS #
+##############
+def test_create_PerfEventRaplDevice_with_no_perf_rapl_api_raise_NoSuchEnergyDeviceError(empty_perf_fs):
+    with pytest.raises(NoSuchEnergyDeviceError):
+        PerfEventRaplDevice()
+
+
+def test_create_PerfEventRaplDevice(perf_pkg_one_socket):
+    device = PerfEventRaplDevice()
+    assert device is not None
+    assert isinstance(device, PerfEventRaplDevice)
+
+
+###########################
+# AVAILABLE DOMAINS TESTS #
+###########################
+def test_available_domains_with_pkg_perf_rapl_api_return_correct_values(perf_pkg_one_socket):
+    returned_values = PerfEventRaplDevice.available_domains()
+    correct_values = [RaplPackageDomain(0)]
+    assert sorted(correct_values) == sorted(returned_values)
+
+
+def test_available_domains_with_pkg_dram_perf_rapl_api_two_cpu_return_correct_values(perf_pkg_dram_two_socket):
+    returned_values = PerfEventRaplDevice.available_domains()
+    correct_values = [RaplPackageDomain(0), RaplDramDomain(0), RaplPackageDomain(1), RaplDramDomain(1)]
+    assert sorted(correct_values) == sorted(returned_values)
+
+
+###################
+# CONFIGURE TESTS #
+###################
+def test_configure_device_to_get_dram_energy_with_no_perf_dram_event_raise_NoSuchDomainError(perf_pkg_one_socket):
+    device = PerfEventRaplDevice()
+
+    with pytest.raises(NoSuchDomainError):
+        device.configure([RaplDramDomain(0)])
+
+
+def test_configure_device_with_refused_dram_event_close_already_opened_events(perf_pkg_dram_two_socket):
+    device = PerfEventRaplDevice()
+    perf_pkg_dram_two_socket.refused_configs.add(DRAM_CONFIG)
+
+    with pytest.raises(OSError):
+        device.configure([RaplPackageDomain(0), RaplPackageDomain(1), RaplDramDomain(0)])
+    for cpu in perf_pkg_dram_two_socket.socket_cpus:
+        group_file = perf_pkg_dram_two_socket.fs.get_object(COUNTERS_DIR_NAME + '/' + str(cpu))
+        assert not perf_pkg_dram_two_socket.fs.has_open_file(group_file)
+
+
+@patch('platform.machine', return_value='sparc64')
+def test_perf_event_open_on_unknown_architecture_raise_OSError(_mocked_machine):
+    with pytest.raises(OSError) as error_info:
+        _perf_event_open(b'', -1, 0, -1, 0)
+    assert error_info.value.errno == errno.ENOSYS
+
+
+##################################
+# CONFIGURE AND GET ENERGY TESTS #
+##################################
+def test_get_default_energy_values_with_pkg_perf_rapl_api(perf_pkg_one_socket):
+    device = PerfEventRaplDevice()
+    device.configure()
+    assert device.get_energy() == [perf_pkg_one_socket.domains_current_energy['package_0']]
+
+
+def test_get_package_dram_energy_with_pkg_dram_perf_rapl_api_two_sockets_return_correct_value(perf_pkg_dram_two_socket):
+    device = PerfEventRaplDevice()
+    device.configure([RaplPackageDomain(0), RaplDramDomain(0), RaplPackageDomain(1), RaplDramDomain(1)])
+    assert device.get_energy() == [perf_pkg_dram_two_socket.domains_current_energy['package_0'],
+                                   perf_pkg_dram_two_socket.domains_current_energy['dram_0'],
+                                   perf_pkg_dram_two_socket.domains_current_energy['package_1'],
+                                   perf_pkg_dram_two_socket.domains_current_energy['dram_1']]
+
+
+def test_get_dram_energy_on_socket_1_with_pkg_dram_perf_rapl_api_two_sockets_return_correct_value(perf_pkg_dram_two_socket):
+    device = PerfEventRaplDevice()
+    device.configure([RaplDramDomain(1)])
+    assert device.get_energy() == [perf_pkg_dram_two_socket.domains_current_energy['dram_1']]
+
+
+def test_get_energy_of_domains_from_two_socket_groups_return_values_in_configured_order(perf_pkg_dram_two_socket):
+    device = PerfEventRaplDevice()
+    device.configure([RaplDramDomain(1), RaplPackageDomain(0), RaplPackageDomain(1)])
+    assert device.get_energy() == [perf_pkg_dram_two_socket.domains_current_energy['dram_1'],
+                                   perf_pkg_dram_two_socket.domains_current_energy['package_0'],
+                                   perf_pkg_dram_two_socket.domains_current_energy['package_1']]
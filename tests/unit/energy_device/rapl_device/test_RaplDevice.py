@@ -83,6 +83,13 @@ def test_available_domains_with_pkg_dram_rapl_api_two_cpu_return_correct_values(
     assert sorted(correct_values) == sorted(returned_values)
 
 
+def test_available_domains_with_dram_rapl_api_on_second_sub_zone_return_correct_values(fs_pkg_one_socket):
+    fs_pkg_one_socket.add_domain(CORE_0_DIR_NAME, 'dram', 'dram_0')
+    returned_values = RaplDevice.available_domains()
+    correct_values = [RaplPackageDomain(0), RaplDramDomain(0)]
+    assert sorted(correct_values) == sorted(returned_values)
+
+
 ###################
 # CONFIGURE TESTS #
 ###################
@@ -237,3 +244,54 @@ def test_get_package0_and_all_dram_energy_with_pkg_dram_rapl_api_two_sockets_ret
     assert device.get_energy() == [fs_pkg_dram_two_socket.domains_current_energy['package_0'],
                                    fs_pkg_dram_two_socket.domains_current_energy['dram_0'],
                                    fs_pkg_dram_two_socket.domains_current_energy['dram_1']]
+
+
+#######################
+# ENERGY RANGES TESTS #
+#######################
+def test_get_energy_ranges_on_non_configured_device_raise_NotConfiguredDeviceException(fs_pkg_dram_one_socket):
+    device = RaplDevice()
+
+    with pytest.raises(NotConfiguredDeviceException):
+        device.get_energy_ranges()
+
+
+def test_get_energy_ranges_with_pkg_dram_rapl_api_return_max_energy_range_of_each_domain(fs_pkg_dram_one_socket):
+    device = RaplDevice()
+    device.configure([RaplDramDomain(0), RaplPackageDomain(0)])
+    assert device.get_energy_ranges() == [MAX_ENERGY_RANGE_UJ, MAX_ENERGY_RANGE_UJ]
+
+
+###############
+# CLOSE TESTS #
+###############
+def test_get_dram_energy_after_closing_and_reconfiguring_device_return_correct_value(fs_pkg_dram_one_socket):
+    device = RaplDevice()
+    device.configure([RaplPackageDomain(0)])
+    device.close()
+    device.configure([RaplDramDomain(0)])
+    assert device.get_energy() == [fs_pkg_dram_one_socket.domains_current_energy['dram_0']]
+
+
+def test_configure_device_with_missing_dram_api_file_close_already_opened_files(fs_pkg_dram_one_socket):
+    device = RaplDevice()
+    fs_pkg_dram_one_socket.fs.remove_object(DRAM_0_FILE_NAME)
+    with pytest.raises(OSError):
+        device.configure([RaplPackageDomain(0), RaplDramDomain(0)])
+    assert not fs_pkg_dram_one_socket.fs.has_open_file(fs_pkg_dram_one_socket.fs.get_object(PKG_0_FILE_NAME))
+
+
+#########################
+# DOMAINS CACHING TESTS #
+#########################
+def test_available_domains_after_adding_dram_domain_return_cached_values(fs_pkg_dram_one_socket):
+    RaplDevice.available_domains()
+    fs_pkg_dram_one_socket.add_domain(DRAM_1_DIR_NAME, 'dram', 'dram_1')
+    assert sorted(RaplDevice.available_domains()) == sorted([RaplPackageDomain(0), RaplDramDomain(0)])
+
+
+def test_create_RaplDevice_with_force_rescan_after_adding_socket_return_new_domains(fs_pkg_one_socket):
+    RaplDevice.available_domains()
+    fs_pkg_one_socket.add_domain(SOCKET_1_DIR_NAME, 'package-1', 'package_1')
+    RaplDevice(force_rescan=True)
+    assert sorted(RaplDevice.available_domains()) == sorted([RaplPackageDomain(0), RaplPackageDomain(1)])
@@ -66,3 +66,13 @@ def test_package_get_device_type_return_RaplDevice():
 def test_dram_get_device_type_return_RaplDevice():
     domain = RaplDramDomain(0)
     assert domain.get_device_type() == RaplDevice
+
+
+def test_equal_domains_have_same_hash(integer_value):
+    assert hash(RaplPackageDomain(integer_value)) == hash(RaplPackageDomain(integer_value))
+
+
+def test_dict_with_domain_keys_return_value_of_equal_domain():
+    domain_dict = {RaplPackageDomain(0): 'package', RaplDramDomain(0): 'dram', RaplPackageDomain(1): 'package1'}
+    assert domain_dict[RaplDramDomain(0)] == 'dram'
+    assert domain_dict[RaplPackageDomain(1)] == 'package1'
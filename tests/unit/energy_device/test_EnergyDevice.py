@@ -0,0 +1,63 @@
+# MIT License
+# Copyright (c) 2019, INRIA
+# Copyright (c) 2019, University of Lille
+# All rights reserved.
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import pytest
+
+from pyJoules.exception import NoSuchDomainError
+from pyJoules.energy_device import EnergyDevice, EnergyDomain
+
+
+class EqOnlyDomain(EnergyDomain):
+    """
+    domain that only defines __eq__ and is thus not hashable
+    """
+
+    def __init__(self, domain_id):
+        EnergyDomain.__init__(self)
+        self.domain_id = domain_id
+
+    def __repr__(self):
+        return 'eq_only_' + str(self.domain_id)
+
+    def __eq__(self, other):
+        return isinstance(other, EqOnlyDomain) and self.domain_id == other.domain_id
+
+
+class EqOnlyDevice(EnergyDevice):
+
+    @staticmethod
+    def available_domains():
+        return [EqOnlyDomain(0), EqOnlyDomain(1)]
+
+
+###################
+# CONFIGURE TESTS #
+###################
+def test_configure_device_with_non_hashable_domain_set_configured_domains():
+    device = EqOnlyDevice()
+    device.configure([EqOnlyDomain(1)])
+    assert device.get_configured_domains() == [EqOnlyDomain(1)]
+
+
+def test_configure_device_with_non_available_non_hashable_domain_raise_NoSuchDomainError():
+    device = EqOnlyDevice()
+
+    with pytest.raises(NoSuchDomainError):
+        device.configure([EqOnlyDomain(2)])
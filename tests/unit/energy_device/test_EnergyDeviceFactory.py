@@ -25,7 +25,7 @@ from pyJoules.energy_device import EnergyDeviceFactory
 from pyJoules.energy_device.rapl_device import RaplPackageDomain, RaplDramDomain, RaplDevice
 from pyJoules.energy_device.nvidia_device import NvidiaGPUDevice, NvidiaGPUDomain
 from ...utils.fake_nvidia_api import no_gpu_api, one_gpu_api, two_gpu_api
-from ...utils.rapl_fs import fs_pkg_one_socket, fs_pkg_dram_one_socket, empty_fs
+from ...utils.rapl_fs import fs_pread, fs_pkg_one_socket, fs_pkg_dram_one_socket, empty_fs
 
 
 def test_create_devices_with_one_rapl_package_domain_return_one_correctly_configured_rapl_device(fs_pkg_dram_one_socket):
@@ -19,8 +19,6 @@
 # SOFTWARE.
 import pytest
 
-from mock import patch
-
 from pyJoules.energy_meter import EnergyMeter, EnergySample
 from pyJoules.energy_meter import EnergyMeterNotStartedError, EnergyMeterNotStoppedError, SampleNotFoundError
 from pyJoules.energy_device import EnergyDevice, EnergyDomain
@@ -38,7 +36,18 @@ DEVICE2_ENERGY_TRACE = [[4.0],
                         [10.3],
                         [11.123]]
 
-TIMESTAMP_TRACE = [1.1, 2.2, 3.3, 4.4, 5.5]
+WRAPPING_DEVICE_ENERGY_TRACE = [[8.0],
+                                [3.0]]
+
+WRAPPING_DEVICE_ENERGY_RANGE = 10.0
+
+# None values are reads that fail
+FAILING_DEVICE_ENERGY_TRACE = [[0.0],
+                               None,
+                               [200.0],
+                               [300.0]]
+
+TIMESTAMP_TRACE = [1100000000, 2200000000, 3300000000, 4400000000, 5500000000]
 
 
 class EnergyDomainDevice1Domain1(EnergyDomain):
@@ -90,13 +99,47 @@ class MockedEnergyDevice2(EnergyDevice):
         return self.iterator.__next__()
 
 
+class MockedWrappingEnergyDevice(EnergyDevice):
+
+    def __init__(self):
+        EnergyDevice.__init__(self)
+        self.iterator = WRAPPING_DEVICE_ENERGY_TRACE.__iter__()
+
+    @staticmethod
+    def available_domains():
+        return [EnergyDomainDevice2Domain1()]
+
+    def get_energy(self):
+        return self.iterator.__next__()
+
+    def get_energy_ranges(self):
+        return [WRAPPING_DEVICE_ENERGY_RANGE]
+
+
+class MockedFailingEnergyDevice(EnergyDevice):
+
+    def __init__(self):
+        EnergyDevice.__init__(self)
+        self.iterator = FAILING_DEVICE_ENERGY_TRACE.__iter__()
+
+    @staticmethod
+    def available_domains():
+        return [EnergyDomainDevice2Domain1()]
+
+    def get_energy(self):
+        values = self.iterator.__next__()
+        if values is None:
+            raise OSError()
+        return values
+
+
 @pytest.fixture
 def energy_meter():
     device1 = MockedEnergyDevice1()
     device1.configure()
     device2 = MockedEnergyDevice2()
     device2.configure()
-    return EnergyMeter([device1, device2])
+    return EnergyMeter([device1, device2], clock=iter(TIMESTAMP_TRACE).__next__)
 
 
 ############################
@@ -153,9 +196,9 @@ def test_iter_on_one_sample_trace_should_return_one_sample(energy_meter):
 
 @pytest.fixture
 def sample1():
-    ts = TIMESTAMP_TRACE[0]
+    ts = TIMESTAMP_TRACE[0] / 1e9
     tag = ''
-    duration = TIMESTAMP_TRACE[1] - TIMESTAMP_TRACE[0]
+    duration = (TIMESTAMP_TRACE[1] - TIMESTAMP_TRACE[0]) / 1e9
     energy = {str(EnergyDomainDevice1Domain1()): DEVICE1_ENERGY_TRACE[1][0] - DEVICE1_ENERGY_TRACE[0][0],
               str(EnergyDomainDevice1Domain2()): DEVICE1_ENERGY_TRACE[1][1] - DEVICE1_ENERGY_TRACE[0][1],
               str(EnergyDomainDevice2Domain1()): DEVICE2_ENERGY_TRACE[1][0] - DEVICE2_ENERGY_TRACE[0][0]}
@@ -164,9 +207,9 @@ def sample1():
 
 @pytest.fixture
 def sample2():
-    ts = TIMESTAMP_TRACE[1]
+    ts = TIMESTAMP_TRACE[1] / 1e9
     tag = ''
-    duration = TIMESTAMP_TRACE[2] - TIMESTAMP_TRACE[1]
+    duration = (TIMESTAMP_TRACE[2] - TIMESTAMP_TRACE[1]) / 1e9
     energy = {str(EnergyDomainDevice1Domain1()): DEVICE1_ENERGY_TRACE[2][0] - DEVICE1_ENERGY_TRACE[1][0],
               str(EnergyDomainDevice1Domain2()): DEVICE1_ENERGY_TRACE[2][1] - DEVICE1_ENERGY_TRACE[1][1],
               str(EnergyDomainDevice2Domain1()): DEVICE2_ENERGY_TRACE[2][0] - DEVICE2_ENERGY_TRACE[1][0]}
@@ -175,17 +218,16 @@ def sample2():
 
 @pytest.fixture
 def sample3():
-    ts = TIMESTAMP_TRACE[3]
+    ts = TIMESTAMP_TRACE[3] / 1e9
     tag = ''
-    duration = TIMESTAMP_TRACE[4] - TIMESTAMP_TRACE[3]
+    duration = (TIMESTAMP_TRACE[4] - TIMESTAMP_TRACE[3]) / 1e9
     energy = {str(EnergyDomainDevice1Domain1()): DEVICE1_ENERGY_TRACE[4][0] - DEVICE1_ENERGY_TRACE[3][0],
               str(EnergyDomainDevice1Domain2()): DEVICE1_ENERGY_TRACE[4][1] - DEVICE1_ENERGY_TRACE[3][1],
               str(EnergyDomainDevice2Domain1()): DEVICE2_ENERGY_TRACE[4][0] - DEVICE2_ENERGY_TRACE[3][0]}
     return EnergySample(ts, tag, duration, energy)
 
 
-@patch('time.perf_counter', side_effect=TIMESTAMP_TRACE)
-def test_iter_on_one_sample_trace_should_return_correct_values(_mocked_fun, energy_meter, sample1):
+def test_iter_on_one_sample_trace_should_return_correct_values(energy_meter, sample1):
     energy_meter.start()
     energy_meter.stop()
     samples = []
@@ -194,8 +236,7 @@ def test_iter_on_one_sample_trace_should_return_correct_values(_mocked_fun, ener
         assert_sample_are_equals(sample, sample1)
 
 
-@patch('time.perf_counter', side_effect=TIMESTAMP_TRACE)
-def test_iter_on_two_sample_trace_should_return_two_sample(_mocked_fun, energy_meter):
+def test_iter_on_two_sample_trace_should_return_two_sample(energy_meter):
     energy_meter.start()
     energy_meter.record()
     energy_meter.stop()
@@ -207,8 +248,7 @@ def test_iter_on_two_sample_trace_should_return_two_sample(_mocked_fun, energy_m
     assert len(samples) == 2
 
 
-@patch('time.perf_counter', side_effect=TIMESTAMP_TRACE)
-def test_iter_on_two_sample_trace_should_return_correct_values(_mocked_fun, energy_meter, sample1, sample2):
+def test_iter_on_two_sample_trace_should_return_correct_values(energy_meter, sample1, sample2):
     energy_meter.start()
     energy_meter.record()
     energy_meter.stop()
@@ -217,15 +257,13 @@ def test_iter_on_two_sample_trace_should_return_correct_values(_mocked_fun, ener
         assert_sample_are_equals(sample, correct_sample)
 
 
-@patch('time.perf_counter', side_effect=TIMESTAMP_TRACE)
-def test_get_sample_on_a_one_sample_trace_return_correct_values(_mocked_fun, energy_meter, sample1):
+def test_get_sample_on_a_one_sample_trace_return_correct_values(energy_meter, sample1):
     energy_meter.start()
     energy_meter.stop()
     assert_sample_are_equals(energy_meter.get_sample(''), sample1)
 
 
-@patch('time.perf_counter', side_effect=TIMESTAMP_TRACE)
-def test_get_sample_on_a_two_sample_trace_with_same_names_return_first_sample(_mocked_fun, energy_meter, sample1):
+def test_get_sample_on_a_two_sample_trace_with_same_names_return_first_sample(energy_meter, sample1):
     energy_meter.start()
     energy_meter.record()
     energy_meter.stop()
@@ -233,8 +271,7 @@ def test_get_sample_on_a_two_sample_trace_with_same_names_return_first_sample(_m
     assert_sample_are_equals(energy_meter.get_sample(''), sample1)
 
 
-@patch('time.perf_counter', side_effect=TIMESTAMP_TRACE)
-def test_get_sample_by_their_names_return_correct_samples(_mocked_fun, energy_meter, sample1, sample2):
+def test_get_sample_by_their_names_return_correct_samples(energy_meter, sample1, sample2):
     energy_meter.start('sample1')
     energy_meter.record('sample2')
     energy_meter.stop()
@@ -254,8 +291,17 @@ def test_get_sample_that_does_not_exist_raise_SampleNotFoundError(energy_meter):
         energy_meter.get_sample('sample1')
 
 
-@patch('time.perf_counter', side_effect=TIMESTAMP_TRACE)
-def test_second_start_on_an_energy_meter_should_restart_the_trace(_mocked_fun, energy_meter, sample3):
+def test_get_sample_of_a_previous_trace_raise_SampleNotFoundError(energy_meter):
+    energy_meter.start('sample1')
+    energy_meter.stop()
+    energy_meter.start('sample2')
+    energy_meter.stop()
+
+    with pytest.raises(SampleNotFoundError):
+        energy_meter.get_sample('sample1')
+
+
+def test_second_start_on_an_energy_meter_should_restart_the_trace(energy_meter, sample3):
     energy_meter.start()
     energy_meter.record()
     energy_meter.stop()
@@ -270,6 +316,21 @@ def test_second_start_on_an_energy_meter_should_restart_the_trace(_mocked_fun, e
     assert_sample_are_equals(samples[0], sample3)
 
 
+def test_iter_started_before_a_second_start_should_return_samples_of_the_first_trace(energy_meter, sample1, sample2):
+    energy_meter.start()
+    energy_meter.record()
+    energy_meter.stop()
+
+    iterator = iter(energy_meter)
+    assert_sample_are_equals(next(iterator), sample1)
+    energy_meter.start()
+    energy_meter.stop()
+
+    samples = list(iterator)
+    assert len(samples) == 1
+    assert_sample_are_equals(samples[0], sample2)
+
+
 ############
 # TEST TAG #
 ############
@@ -286,3 +347,59 @@ def test_define_energy_meter_with_default_tag_create_sample_with_default_tag():
 
     sample = meter.get_sample('tag')
     assert sample.tag == 'tag'
+
+
+####################
+# TEST WRAP AROUND #
+####################
+def test_get_sample_on_trace_with_counter_wrap_around_return_energy_consumed_across_wrap_around():
+    device = MockedWrappingEnergyDevice()
+    device.configure()
+    meter = EnergyMeter([device], clock=iter(TIMESTAMP_TRACE).__next__)
+
+    meter.start()
+    meter.stop()
+
+    sample = meter.get_sample('')
+    assert sample.energy == {str(EnergyDomainDevice2Domain1()): 5.0}
+
+
+#######################
+# TEST FAILING DEVICE #
+#######################
+def test_get_samples_after_failing_record_return_samples_of_successful_measures():
+    device1 = MockedEnergyDevice1()
+    device1.configure()
+    device2 = MockedFailingEnergyDevice()
+    device2.configure()
+    meter = EnergyMeter([device1, device2], clock=iter(TIMESTAMP_TRACE).__next__)
+
+    meter.start('sample1')
+    with pytest.raises(OSError):
+        meter.record('failing_sample')
+    meter.record('sample2')
+    meter.stop()
+
+    # the failing measure consumed the second value of device1 and the second timestamp
+    sample1 = EnergySample(TIMESTAMP_TRACE[0] / 1e9, 'sample1', (TIMESTAMP_TRACE[2] - TIMESTAMP_TRACE[0]) / 1e9,
+                           {str(EnergyDomainDevice1Domain1()): DEVICE1_ENERGY_TRACE[2][0] - DEVICE1_ENERGY_TRACE[0][0],
+                            str(EnergyDomainDevice1Domain2()): DEVICE1_ENERGY_TRACE[2][1] - DEVICE1_ENERGY_TRACE[0][1],
+                            str(EnergyDomainDevice2Domain1()): 200.0})
+    sample2 = EnergySample(TIMESTAMP_TRACE[2] / 1e9, 'sample2', (TIMESTAMP_TRACE[3] - TIMESTAMP_TRACE[2]) / 1e9,
+                           {str(EnergyDomainDevice1Domain1()): DEVICE1_ENERGY_TRACE[3][0] - DEVICE1_ENERGY_TRACE[2][0],
+                            str(EnergyDomainDevice1Domain2()): DEVICE1_ENERGY_TRACE[3][1] - DEVICE1_ENERGY_TRACE[2][1],
+                            str(EnergyDomainDevice2Domain1()): 100.0})
+    samples = list(meter)
+    assert len(samples) == 2
+    assert_sample_are_equals(samples[0], sample1)
+    assert_sample_are_equals(samples[1], sample2)
+
+
+def test_record_with_device_returning_too_few_values_raise_ValueError():
+    device1 = MockedEnergyDevice1()
+    device1.configure()
+    device1.iterator = iter([[1.0]])
+    meter = EnergyMeter([device1])
+
+    with pytest.raises(ValueError):
+        meter.start()
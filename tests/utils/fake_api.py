@@ -28,6 +28,12 @@ class FakeAPI:
     def get_device_type(self):
         raise NotImplementedError()
 
+    def get_energy_range(self):
+        """
+        :return: value at which the energy counters of the API wrap around, 0 if they never wrap around
+        """
+        return 0
+
 
 class CorrectTrace:
     """
@@ -40,7 +46,7 @@ class CorrectTrace:
         for api in fake_api_list:
             self.fake_api[api.get_device_type()] = api
         self.energy_states = []
-        self.correct_timestamps = timestamps
+        self.correct_timestamps = [timestamp / 1e9 for timestamp in timestamps]
         self.duration_trace = self._compute_duration_trace(timestamps)
         self.tag_trace = []
 
@@ -56,7 +62,7 @@ class CorrectTrace:
         duration_trace = []
         current_ts = timestamps[0]
         for next_ts in timestamps[1:]:
-            duration_trace.append(next_ts - current_ts)
+            duration_trace.append((next_ts - current_ts) / 1e9)
             current_ts = next_ts
         return duration_trace
 
@@ -72,7 +78,10 @@ class CorrectTrace:
         for next_state in self.energy_states[1:]:
             sample = {}
             for domain in self.domains:
-                sample[str(domain)] = next_state[str(domain)] - current_state[str(domain)]
+                energy = next_state[str(domain)] - current_state[str(domain)]
+                if energy < 0:
+                    energy += self.fake_api[domain.get_device_type()].get_energy_range()
+                sample[str(domain)] = energy
             current_state = next_state
             trace.append(sample)
         return trace
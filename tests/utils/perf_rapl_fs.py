@@ -0,0 +1,152 @@
+# MIT License
+# Copyright (c) 2019, INRIA
+# Copyright (c) 2019, University of Lille
+# All rights reserved.
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import errno
+import random
+import struct
+import pytest
+
+from mock import patch
+from pyJoules.energy_device.perf_rapl_device import PerfEventRaplDevice, PERF_RAPL_API_DIR, PERF_FORMAT_GROUP
+from pyJoules.energy_device.perf_rapl_device import PERF_FLAG_FD_CLOEXEC
+from .fake_api import FakeAPI
+
+
+PMU_TYPE = 29
+PKG_CONFIG = 0x02
+DRAM_CONFIG = 0x03
+SCALE = 2.3283064365386962890625e-10
+
+COUNTERS_DIR_NAME = '/perf_event_counters'
+
+
+class PerfRaplFS(FakeAPI):
+    """
+    Fake perf_event RAPL API, each opened event group is a file containing the group read format : the number of
+    events of the group followed by the raw counter value of each event
+    """
+
+    def __init__(self, fs, socket_cpus):
+        self.fs = fs
+        self.socket_cpus = [int(cpu) for cpu in socket_cpus.split(',')]
+        self.domains_raw_energy = {}
+        self.domains_current_energy = {}
+        self.events_config = {}
+        self.groups = {}
+        # events that perf_event_open refuses to open, as when the caller lacks the permission to monitor them
+        self.refused_configs = set()
+        self.fs.create_file(PERF_RAPL_API_DIR + '/type', contents=str(PMU_TYPE) + '\n')
+        self.fs.create_file(PERF_RAPL_API_DIR + '/cpumask', contents=socket_cpus + '\n')
+
+    def add_event(self, event_name, domain_name, config, socket_number):
+        event_file_name = PERF_RAPL_API_DIR + '/events/' + event_name
+        self.fs.create_file(event_file_name, contents='event=' + hex(config) + '\n')
+        self.fs.create_file(event_file_name + '.scale', contents=str(SCALE) + '\n')
+        self.fs.create_file(event_file_name + '.unit', contents='Joules\n')
+        self.events_config[config] = domain_name
+        for socket_id in range(socket_number):
+            self.domains_raw_energy[domain_name + '_' + str(socket_id)] = None
+
+    def _group_file_name(self, cpu):
+        return COUNTERS_DIR_NAME + '/' + str(cpu)
+
+    def _write_group_files(self):
+        for cpu, (_, group_configs) in self.groups.items():
+            socket_id = self.socket_cpus.index(cpu)
+            raw_values = [self.domains_raw_energy[self.events_config[config] + '_' + str(socket_id)]
+                          for config in group_configs]
+            with open(self._group_file_name(cpu), 'wb') as group_file:
+                group_file.write(struct.pack('<' + 'Q' * (len(raw_values) + 1), len(raw_values), *raw_values))
+
+    def reset_values(self):
+        for domain_id in self.domains_raw_energy:
+            raw_value = random.randrange(2 ** 64)
+            self.domains_raw_energy[domain_id] = raw_value
+            self.domains_current_energy[domain_id] = raw_value * (SCALE * 1e6)
+        self._write_group_files()
+
+    def perf_event_open(self, attr, pid, cpu, group_fd, flags):
+        pmu_type, _, config, _, _, read_format = struct.unpack_from('<IIQQQQ', attr)
+        assert pmu_type == PMU_TYPE
+        assert read_format == PERF_FORMAT_GROUP
+        assert pid == -1
+        assert flags == PERF_FLAG_FD_CLOEXEC
+        if config in self.refused_configs:
+            raise OSError(errno.EACCES, os.strerror(errno.EACCES))
+        if group_fd == -1:
+            assert cpu not in self.groups
+            self.fs.create_file(self._group_file_name(cpu))
+            api_fd = os.open(self._group_file_name(cpu), os.O_RDONLY)
+            self.groups[cpu] = (api_fd, [config])
+        else:
+            assert self.groups[cpu][0] == group_fd
+            api_fd = os.open(self._group_file_name(cpu), os.O_RDONLY)
+            self.groups[cpu][1].append(config)
+        self._write_group_files()
+        return api_fd
+
+    def get_device_type(self):
+        return PerfEventRaplDevice
+
+
+def _create_perf_rapl_fs(fs, socket_cpus):
+    perf_rapl_fs = PerfRaplFS(fs, socket_cpus)
+    fs.create_dir(COUNTERS_DIR_NAME)
+    return perf_rapl_fs
+
+
+@pytest.fixture
+def empty_perf_fs(fs):
+    """
+    filesystem describing a machine with one CPU but no perf_event RAPL API
+    """
+    return fs
+
+
+@pytest.fixture
+def perf_pkg_one_socket(fs):
+    """
+    filesystem describing a machine with one CPU and perf_event RAPL API for package
+    """
+    perf_rapl_fs = _create_perf_rapl_fs(fs, '0')
+    perf_rapl_fs.add_event('energy-pkg', 'package', PKG_CONFIG, 1)
+    perf_rapl_fs.reset_values()
+    patcher_open = patch('pyJoules.energy_device.perf_rapl_device._perf_event_open',
+                         side_effect=perf_rapl_fs.perf_event_open)
+    patcher_open.start()
+    yield perf_rapl_fs
+    patcher_open.stop()
+
+
+@pytest.fixture
+def perf_pkg_dram_two_socket(fs):
+    """
+    filesystem describing a machine with two CPU and perf_event RAPL API for package and dram
+    """
+    perf_rapl_fs = _create_perf_rapl_fs(fs, '0,28')
+    perf_rapl_fs.add_event('energy-pkg', 'package', PKG_CONFIG, 2)
+    perf_rapl_fs.add_event('energy-ram', 'dram', DRAM_CONFIG, 2)
+    perf_rapl_fs.reset_values()
+    patcher_open = patch('pyJoules.energy_device.perf_rapl_device._perf_event_open',
+                         side_effect=perf_rapl_fs.perf_event_open)
+    patcher_open.start()
+    yield perf_rapl_fs
+    patcher_open.stop()
@@ -23,6 +23,7 @@ import random
 import pytest
 import pyfakefs
 
+from mock import patch
 from pyJoules.energy_device.rapl_device import RaplDevice
 from .fake_api import FakeAPI
 
@@ -49,6 +50,9 @@ CORE_1_DIR_NAME = SOCKET_1_DIR_NAME + '/intel-rapl:1:1'
 CORE_0_FILE_NAME = CORE_0_DIR_NAME + '/energy_uj'
 CORE_1_FILE_NAME = CORE_1_DIR_NAME + '/energy_uj'
 
+# energy_uj files contain an integer number of micro Joules, lower than the domain max_energy_range_uj value
+MAX_ENERGY_RANGE_UJ = 262143328850
+
 
 class RaplFS(FakeAPI):
 
@@ -59,48 +63,72 @@ class RaplFS(FakeAPI):
 
     def add_domain(self, domain_dir_name, domain_name, domain_id):
         self.fs.create_file(domain_dir_name + '/name', contents=domain_name + '\n')
-        energy_value = random.random()
+        energy_value = random.randrange(MAX_ENERGY_RANGE_UJ)
         self.fs.create_file(domain_dir_name + '/energy_uj', contents=str(energy_value) + '\n')
+        self.fs.create_file(domain_dir_name + '/max_energy_range_uj', contents=str(MAX_ENERGY_RANGE_UJ) + '\n')
         self.domains_energy_file[domain_id] = domain_dir_name + '/energy_uj'
         self.domains_current_energy[domain_id] = energy_value
 
     def reset_values(self):
         for key in self.domains_energy_file:
-            new_val = random.random()
+            new_val = random.randrange(MAX_ENERGY_RANGE_UJ)
             self.domains_current_energy[key] = new_val
             with open(self.domains_energy_file[key], 'w') as energy_file:
                 energy_file.write(str(new_val) + '\n')
 
+    def get_energy_range(self):
+        return MAX_ENERGY_RANGE_UJ
+
     def get_device_type(self):
         return RaplDevice
 
 
+def _fake_pread(fd, length, offset):
+    # pyfakefs does not emulate os.pread, fake file descriptors have to be read with lseek and read
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, length)
+
+
+@pytest.fixture
+def fs_pread(fs):
+    """
+    fake filesystem on which os.pread could be used to read fake file descriptors and RAPL domains have not been
+    cached from another filesystem
+    """
+    patcher_pread = patch('os.pread', side_effect=_fake_pread)
+    patcher_cache = patch('pyJoules.energy_device.rapl_device._cached_domain_files', None)
+    patcher_pread.start()
+    patcher_cache.start()
+    yield fs
+    patcher_pread.stop()
+    patcher_cache.stop()
+
 
 @pytest.fixture
-def empty_fs(fs):
+def empty_fs(fs_pread):
     """
     filesystem describing a machine with one CPU but no RAPL API
     """
-    return RaplFS(fs)
+    return RaplFS(fs_pread)
 
 
 @pytest.fixture
-def fs_pkg_one_socket(fs):
+def fs_pkg_one_socket(fs_pread):
     """
     filesystem describing a machine with one CPU and RAPL API for package
     """
-    rapl_fs = RaplFS(fs)
+    rapl_fs = RaplFS(fs_pread)
     rapl_fs.add_domain(SOCKET_0_DIR_NAME, 'package-0', 'package_0')
     rapl_fs.reset_values()
     return rapl_fs
 
 
 @pytest.fixture
-def fs_pkg_dram_one_socket(fs):
+def fs_pkg_dram_one_socket(fs_pread):
     """
     filesystem describing a machine with one CPU and RAPL API for package and dram
     """
-    rapl_fs = RaplFS(fs)
+    rapl_fs = RaplFS(fs_pread)
     rapl_fs.add_domain(SOCKET_0_DIR_NAME, 'package-0', 'package_0')
     rapl_fs.add_domain(DRAM_0_DIR_NAME, 'dram', 'dram_0')
     rapl_fs.reset_values()
@@ -108,11 +136,11 @@ def fs_pkg_dram_one_socket(fs):
 
 
 @pytest.fixture
-def fs_pkg_psys_one_socket(fs):
+def fs_pkg_psys_one_socket(fs_pread):
     """
     filesystem describing a machine with one CPU and RAPL API for package and psys
     """
-    rapl_fs = RaplFS(fs)
+    rapl_fs = RaplFS(fs_pread)
     rapl_fs.add_domain(SOCKET_0_DIR_NAME, 'package-0', 'package_0')
     rapl_fs.add_domain('/sys/class/powercap/intel-rapl/intel-rapl:1', 'psys', 'psys')
     rapl_fs.reset_values()
@@ -120,11 +148,11 @@ def fs_pkg_psys_one_socket(fs):
 
 
 @pytest.fixture
-def fs_pkg_dram_core_one_socket(fs):
+def fs_pkg_dram_core_one_socket(fs_pread):
     """
     filesystem describing a machine with one CPU and RAPL API for package dram and core
     """
-    rapl_fs = RaplFS(fs)
+    rapl_fs = RaplFS(fs_pread)
     rapl_fs.add_domain(SOCKET_0_DIR_NAME, 'package-0', 'package_0')
     rapl_fs.add_domain(DRAM_0_DIR_NAME, 'dram', 'dram_0')
     rapl_fs.add_domain(CORE_0_DIR_NAME, 'core', 'core_0')
@@ -132,11 +160,11 @@ def fs_pkg_dram_core_one_socket(fs):
     return rapl_fs
 
 @pytest.fixture
-def fs_pkg_dram_uncore_one_socket(fs):
+def fs_pkg_dram_uncore_one_socket(fs_pread):
     """
     filesystem describing a machine with one CPU and RAPL API for package dram and core
     """
-    rapl_fs = RaplFS(fs)
+    rapl_fs = RaplFS(fs_pread)
     rapl_fs.add_domain(SOCKET_0_DIR_NAME, 'package-0', 'package_0')
     rapl_fs.add_domain(DRAM_0_DIR_NAME, 'dram', 'dram_0')
     rapl_fs.add_domain(CORE_0_DIR_NAME, 'uncore', 'uncore_0')
@@ -145,11 +173,11 @@ def fs_pkg_dram_uncore_one_socket(fs):
 
 
 @pytest.fixture
-def fs_pkg_two_socket(fs):
+def fs_pkg_two_socket(fs_pread):
     """
     filesystem describing a machine with two CPU and RAPL API for package
     """
-    rapl_fs = RaplFS(fs)
+    rapl_fs = RaplFS(fs_pread)
     rapl_fs.add_domain(SOCKET_0_DIR_NAME, 'package-0', 'package_0')
     rapl_fs.add_domain(SOCKET_1_DIR_NAME, 'package-1', 'package_1')
     rapl_fs.reset_values()
@@ -157,11 +185,11 @@ def fs_pkg_two_socket(fs):
 
 
 @pytest.fixture
-def fs_pkg_dram_two_socket(fs):
+def fs_pkg_dram_two_socket(fs_pread):
     """
     filesystem describing a machine with two CPU and RAPL API for package and dram
     """
-    rapl_fs = RaplFS(fs)
+    rapl_fs = RaplFS(fs_pread)
     rapl_fs.add_domain(SOCKET_0_DIR_NAME, 'package-0', 'package_0')
     rapl_fs.add_domain(SOCKET_1_DIR_NAME, 'package-1', 'package_1')
     rapl_fs.add_domain(DRAM_0_DIR_NAME, 'dram', 'dram_0')
@@ -171,14 +199,14 @@ def fs_pkg_dram_two_socket(fs):
 
 
 @pytest.fixture
-def fs_pkg_psys_two_socket(fs):
+def fs_pkg_psys_two_socket(fs_pread):
     """
     filesystem describing a machine with two CPU and RAPL API for package
     """
-    rapl_fs = RaplFS(fs)
+    rapl_fs = RaplFS(fs_pread)
     rapl_fs.add_domain(SOCKET_0_DIR_NAME, 'package-0', 'package_0')
     rapl_fs.add_domain(SOCKET_1_DIR_NAME, 'package-1', 'package_1')
 
     rapl_fs.add_domain('/sys/class/powercap/intel-rapl/intel-rapl:2/name', 'psys', 'psys')
     rapl_fs.reset_values()
-    return fs
+    return fs_pread